@@ -4,6 +4,7 @@ Test script for make_shorts.py functionality.
 """
 
 import pytest
+import subprocess
 import sys
 import os
 from pathlib import Path
@@ -11,10 +12,16 @@ from pathlib import Path
 # Add the parent directory to the path so we can import make_shorts
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import make_shorts
 from make_shorts import (
     parse_time, parse_time_pairs, parse_resolution,
-    validate_and_clamp_ranges, build_filter_complex,
-    build_audio_filter_complex, build_audio_ffmpeg_command
+    validate_and_clamp_ranges, check_overlapping_ranges,
+    process_ranges, build_filter_complex,
+    build_audio_filter_complex, build_audio_ffmpeg_command,
+    can_stream_copy, probe_keyframes, copy_start_times, stream_copy_blocker,
+    build_split_command, build_concat_command,
+    write_concat_list, get_video_info, build_ffmpeg_command, crf_to_q, detect_hwenc,
+    run_ffmpeg, load_batch_manifest, run_batch
 )
 
 
@@ -79,6 +86,80 @@ class TestTimePairs:
         assert pairs == [(20.0, 30.0)]
 
 
+class TestProcessRanges:
+    """Test the single-pass range pipeline."""
+    
+    def test_process_ranges_matches_separate_steps(self):
+        """Test parsing and validation match parse_time_pairs + validate_and_clamp_ranges."""
+        tokens = ["10", "20", "00:00:30", "00:00:30", "50", "70"]
+        expected = validate_and_clamp_ranges(parse_time_pairs(tokens), 60.0, clamp=True)
+        
+        assert process_ranges(tokens, 60.0, clamp=True) == expected
+        with pytest.raises(ValueError, match="Range 2"):
+            process_ranges(tokens, 60.0, clamp=False)
+    
+    def test_process_ranges_odd_count(self):
+        """Test error on odd number of tokens."""
+        with pytest.raises(ValueError, match="Odd number of time tokens"):
+            process_ranges(["10", "20", "30"], 60.0)
+    
+    def test_process_ranges_max_duration(self):
+        """Test truncation stops at max_duration without reading further tokens."""
+        tokens = ["0", "10", "20", "30", "40", "50", "invalid", "tokens"]
+        
+        assert process_ranges(tokens, 60.0, max_duration=15.0) == [(0.0, 10.0), (20.0, 25.0)]
+        assert process_ranges(tokens, 60.0, max_duration=10.0) == [(0.0, 10.0)]
+    
+    def test_process_ranges_merge(self):
+        """Test merging counts only the added duration towards max_duration."""
+        tokens = ["0", "10", "5", "15", "20", "30"]
+        
+        assert process_ranges(tokens, 60.0, merge_gap=0.0) == [(0.0, 15.0), (20.0, 30.0)]
+        assert process_ranges(tokens, 60.0, max_duration=20.0, merge_gap=0.0) == [(0.0, 15.0), (20.0, 25.0)]
+    
+    def test_process_ranges_merge_keeps_order(self):
+        """Test that only ranges following each other are merged."""
+        tokens = ["20", "25", "0", "5", "5", "10", "8", "12"]
+        
+        assert process_ranges(tokens, 60.0, merge_gap=0.0) == [(20.0, 25.0), (0.0, 12.0)]
+    
+    def test_process_ranges_merge_gap(self):
+        """Test merging ranges separated by a small gap."""
+        tokens = ["0", "5", "5.5", "10", "12", "15"]
+        
+        assert process_ranges(tokens, 60.0) == [(0.0, 5.0), (5.5, 10.0), (12.0, 15.0)]
+        assert process_ranges(tokens, 60.0, merge_gap=0.5) == [(0.0, 10.0), (12.0, 15.0)]
+
+
+class TestMergeOptions:
+    """Test the --merge-adjacent and --merge-gap options."""
+    
+    def test_merge_adjacent_does_not_consume_positionals(self):
+        """Test --merge-adjacent is a flag, before or after the positionals."""
+        parser = make_shorts.build_parser()
+        
+        args = parser.parse_intermixed_args(['--merge-adjacent', 'in.mp4', '2', '5'])
+        assert (args.input_path, args.time_tokens, args.merge_adjacent) == ('in.mp4', ['2', '5'], True)
+        
+        args = parser.parse_intermixed_args(['in.mp4', '--merge-adjacent', '2', '5', '5', '8'])
+        assert args.time_tokens == ['2', '5', '5', '8']
+        assert args.merge_gap == 0.0
+    
+    def test_merge_gap(self, tmp_path, monkeypatch, capsys):
+        """Test --merge-gap widens the merge only together with --merge-adjacent."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        base = ['make_shorts.py', str(video), '2', '5', '5.5', '8', '--dry-run', '--no-probe']
+        
+        monkeypatch.setattr(sys, 'argv', base + ['--merge-adjacent', '--merge-gap', '1'])
+        assert make_shorts.main() == 0
+        assert 'trim=start=2.0:end=8.0' in capsys.readouterr().out
+        
+        monkeypatch.setattr(sys, 'argv', base + ['--merge-gap', '1'])
+        assert make_shorts.main() == 0
+        assert 'trim=start=2.0:end=5.0' in capsys.readouterr().out
+
+
 class TestResolutionParsing:
     """Test resolution parsing."""
     
@@ -124,6 +205,25 @@ class TestRangeValidation:
         ranges = [(70.0, 80.0)]  # Entirely outside 60s duration
         result = validate_and_clamp_ranges(ranges, 60.0, clamp=True)
         assert result == []  # Should be empty after clamping
+    
+    def test_check_overlapping_ranges(self, caplog):
+        """Test overlap warnings keep the original range numbers."""
+        ranges = [(50.0, 60.0), (0.0, 10.0), (55.0, 70.0), (10.0, 20.0)]
+        check_overlapping_ranges(ranges)
+        
+        warnings = [r.getMessage() for r in caplog.records if r.levelname == 'WARNING']
+        assert len(warnings) == 2
+        assert 'range 1 (50.0, 60.0) and range 3 (55.0, 70.0)' in warnings[0]
+        assert '--merge-adjacent' in warnings[1]
+    
+    def test_check_overlapping_ranges_merging_on(self, caplog):
+        """Test that the --merge-adjacent hint is skipped when merging is already on."""
+        ranges = [(50.0, 60.0), (0.0, 10.0), (55.0, 70.0)]
+        check_overlapping_ranges(ranges, merge_gap=0.0)
+        
+        warnings = [r.getMessage() for r in caplog.records if r.levelname == 'WARNING']
+        assert len(warnings) == 1
+        assert '--merge-adjacent' not in warnings[0]
 
 
 class TestFilterComplex:
@@ -138,7 +238,12 @@ class TestFilterComplex:
         assert 'trim=start=10.0:end=20.0' in filter_str
         assert 'atrim=start=10.0:end=20.0' in filter_str
         assert 'scale=1080:1920:force_original_aspect_ratio=decrease' in filter_str
-        assert 'concat=n=1:v=1:a=1' in filter_str
+        
+        # A single clip maps straight to the output labels without concat
+        assert 'concat' not in filter_str
+        assert filter_str.startswith('[0:v]trim=start=10.0:end=20.0')
+        assert '[outv]' in filter_str
+        assert filter_str.endswith('asetpts=PTS-STARTPTS[outa]')
     
     def test_build_filter_complex_single_clip_no_audio(self):
         """Test filter complex for single clip without audio."""
@@ -148,7 +253,9 @@ class TestFilterComplex:
         # Should not contain audio components
         assert 'trim=start=10.0:end=20.0' in filter_str
         assert 'atrim' not in filter_str
-        assert 'concat=n=1:v=1:a=0' in filter_str
+        assert 'concat' not in filter_str
+        assert filter_str.endswith('[outv]')
+        assert '[outa]' not in filter_str
     
     def test_build_filter_complex_multiple_clips(self):
         """Test filter complex for multiple clips."""
@@ -252,6 +359,498 @@ class TestAudioFFmpegCommand:
         assert '192k' in cmd
 
 
+class TestFFmpegCommand:
+    """Test video ffmpeg command building."""
+    
+    FILTER = "[0:v]trim=start=0:end=5,setpts=PTS-STARTPTS[v0]; [v0]concat=n=1:v=1:a=0[outv]"
+    
+    def test_build_ffmpeg_command_software(self):
+        """Test the default software encoder command."""
+        cmd = build_ffmpeg_command("input.mp4", "output.mp4", self.FILTER, True,
+                                   "libx264", 20, "medium", "aac", "128k")
+        
+        expected = [
+            'ffmpeg', '-i', 'input.mp4',
+            '-filter_complex', self.FILTER,
+            '-map', '[outv]', '-map', '[outa]',
+            '-c:v', 'libx264', '-crf', '20', '-preset', 'medium',
+            '-c:a', 'aac', '-b:a', '128k',
+            '-movflags', '+faststart',
+            'output.mp4'
+        ]
+        
+        assert cmd == expected
+    
+    def test_build_ffmpeg_command_threads(self):
+        """Test explicit thread counts for the filter graph and libx264."""
+        cmd = build_ffmpeg_command("input.mp4", "output.mp4", self.FILTER, False,
+                                   "libx264", 20, "medium", "aac", "128k", threads=8)
+        
+        i = cmd.index('-filter_complex_threads')
+        assert cmd[i:i + 4] == ['-filter_complex_threads', '8', '-filter_threads', '8']
+        i = cmd.index('-x264-params')
+        assert cmd[i + 1] == 'threads=8'
+        
+        # Hardware encoders manage their own threading
+        cmd = build_ffmpeg_command("input.mp4", "output.mp4", self.FILTER, False,
+                                   "libx264", 20, "medium", "aac", "128k", hwenc='nvenc', threads=8)
+        assert '-filter_complex_threads' in cmd
+        assert '-x264-params' not in cmd
+    
+    def test_default_command_has_no_thread_flags(self, tmp_path, monkeypatch, capsys):
+        """Test that without --threads the thread counts are left to ffmpeg and x264."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        monkeypatch.setattr(sys, 'argv', ['make_shorts.py', str(video), '10', '20',
+                                          '--dry-run', '--no-probe'])
+        
+        assert make_shorts.main() == 0
+        
+        out = capsys.readouterr().out
+        assert '-filter_complex_threads' not in out
+        assert '-filter_threads' not in out
+        assert '-x264-params' not in out
+    
+    def test_build_ffmpeg_command_nvenc(self):
+        """Test NVENC replaces the software encoder and decodes with hwaccel."""
+        cmd = build_ffmpeg_command("input.mp4", "output.mp4", self.FILTER, False,
+                                   "libx264", 20, "medium", "aac", "128k", hwenc='nvenc')
+        
+        assert cmd[:3] == ['ffmpeg', '-hwaccel', 'auto']
+        i = cmd.index('-c:v')
+        assert cmd[i:i + 6] == ['-c:v', 'h264_nvenc', '-preset', 'p4', '-cq', '20']
+        assert 'libx264' not in cmd
+    
+    def test_build_ffmpeg_command_vaapi(self):
+        """Test VAAPI uploads the filter output to the device."""
+        cmd = build_ffmpeg_command("input.mp4", "output.mp4", self.FILTER, False,
+                                   "libx264", 20, "medium", "aac", "128k", hwenc='vaapi')
+        
+        assert '-vaapi_device' in cmd
+        assert cmd[cmd.index('-filter_complex') + 1].endswith('[outv]format=nv12,hwupload[outhw]')
+        assert cmd[cmd.index('-map') + 1] == '[outhw]'
+        assert 'h264_vaapi' in cmd
+    
+    def test_crf_to_q(self):
+        """Test CRF to VideoToolbox quality mapping."""
+        assert crf_to_q(0) == 100
+        assert crf_to_q(51) == 1
+        assert crf_to_q(20) == 61
+
+
+class TestDetectHwenc:
+    """Test hardware encoder detection."""
+    
+    ENCODERS = " V....D h264_nvenc  NVIDIA NVENC H.264 encoder\n V....D h264_vaapi  H.264/AVC (VAAPI)\n"
+    
+    @pytest.fixture
+    def fake_ffmpeg(self, monkeypatch):
+        """Fake ffmpeg: lists ENCODERS and fails test encodes for encoders in the broken set."""
+        calls = []
+        broken = set()
+        
+        def fake_run(cmd, **kwargs):
+            calls.append(cmd)
+            if '-encoders' in cmd:
+                return subprocess.CompletedProcess(cmd, 0, stdout=self.ENCODERS, stderr='')
+            encoder = cmd[cmd.index('-c:v') + 1]
+            return subprocess.CompletedProcess(cmd, 1 if encoder in broken else 0, stdout=b'', stderr=b'')
+        
+        detect_hwenc.cache_clear()
+        monkeypatch.setattr(make_shorts.subprocess, 'run', fake_run)
+        yield calls, broken
+        detect_hwenc.cache_clear()
+    
+    def test_detect_hwenc_first_working(self, fake_ffmpeg):
+        """Test the first listed encoder that passes its test encode is chosen, once."""
+        calls, broken = fake_ffmpeg
+        
+        assert detect_hwenc() == 'nvenc'
+        assert detect_hwenc() == 'nvenc'
+        assert len(calls) == 2  # -encoders plus one test encode, then cached
+    
+    def test_detect_hwenc_skips_failing_encoder(self, fake_ffmpeg):
+        """Test a listed encoder without working hardware is skipped."""
+        calls, broken = fake_ffmpeg
+        broken.add('h264_nvenc')
+        
+        assert detect_hwenc() == 'vaapi'
+        vaapi_cmd = calls[-1]
+        assert vaapi_cmd[vaapi_cmd.index('-vaapi_device') + 1] == make_shorts.VAAPI_DEVICE
+    
+    def test_detect_hwenc_none_working(self, fake_ffmpeg):
+        """Test None is returned when every listed encoder fails."""
+        calls, broken = fake_ffmpeg
+        broken.update({'h264_nvenc', 'h264_vaapi'})
+        
+        assert detect_hwenc() is None
+    
+    def test_detect_hwenc_without_ffmpeg(self, monkeypatch):
+        """Test None is returned when ffmpeg is not installed."""
+        def missing(cmd, **kwargs):
+            raise FileNotFoundError(cmd[0])
+        
+        detect_hwenc.cache_clear()
+        monkeypatch.setattr(make_shorts.subprocess, 'run', missing)
+        try:
+            assert detect_hwenc() is None
+        finally:
+            detect_hwenc.cache_clear()
+
+
+class TestRunFFmpeg:
+    """Test running ffmpeg and reporting failures."""
+    
+    def test_run_ffmpeg_success(self):
+        """Test a successful command raises nothing."""
+        run_ffmpeg([sys.executable, '-c', 'print("ok")'])
+    
+    def test_run_ffmpeg_failure_keeps_stderr_tail(self):
+        """Test a failing command reports only the end of its stderr."""
+        script = (
+            "import sys\n"
+            "for i in range(1000): sys.stderr.write(f'line {i}\\r')\n"
+            "sys.exit(3)"
+        )
+        
+        with pytest.raises(RuntimeError, match="return code 3") as excinfo:
+            run_ffmpeg([sys.executable, '-c', script])
+        
+        message = str(excinfo.value)
+        assert 'line 999' in message
+        assert 'line 0\n' not in message
+
+
+class TestStreamCopy:
+    """Test stream copy detection and command building."""
+    
+    VIDEO_INFO = {
+        'duration': 60.0,
+        'has_audio': True,
+        'rotation': 0,
+        'width': 1080,
+        'height': 1920,
+        'codec_name': 'h264',
+        'avg_frame_rate': '30/1',
+        'video_streams': [{'codec_type': 'video'}],
+        'audio_streams': [{'codec_type': 'audio'}]
+    }
+    
+    def test_can_stream_copy_matching_input(self):
+        """Test that a source matching the target can be copied."""
+        assert can_stream_copy(self.VIDEO_INFO, 1080, 1920, 'libx264')
+    
+    def test_can_stream_copy_mismatch(self):
+        """Test that resolution, codec or rotation mismatches force re-encoding."""
+        assert not can_stream_copy(self.VIDEO_INFO, 720, 1280, 'libx264')
+        assert not can_stream_copy(self.VIDEO_INFO, 1080, 1920, 'libx265')
+        assert not can_stream_copy({**self.VIDEO_INFO, 'rotation': 90}, 1080, 1920, 'libx264')
+        assert not can_stream_copy({**self.VIDEO_INFO, 'video_streams': []}, 1080, 1920, 'libx264')
+    
+    def test_probe_keyframes(self, monkeypatch):
+        """Test the keyframe probe reads only short intervals and parses pts times."""
+        calls = []
+        
+        def fake_run(cmd, **kwargs):
+            calls.append(cmd)
+            return subprocess.CompletedProcess(cmd, 0, stdout="6.950000\n12.000000,\nN/A\n\n", stderr='')
+        
+        monkeypatch.setattr(make_shorts.subprocess, 'run', fake_run)
+        
+        assert probe_keyframes("input.mp4", [7.0, 12.0]) == [6.95, 12.0]
+        assert len(calls) == 1
+        assert calls[0][calls[0].index('-read_intervals') + 1] == '6.9%7.001,11.9%12.001'
+        assert calls[0][calls[0].index('-skip_frame') + 1] == 'nokey'
+    
+    def test_copy_start_times(self):
+        """Test mapping range starts to the preceding keyframe within the tolerance."""
+        keyframes = [0.0, 6.95, 12.05, 20.0]
+        ranges = [(0.0, 5.0), (7.0, 9.0), (12.0, 14.0), (20.5, 22.0)]
+        
+        # 12.05 comes after the start, so the copy would begin a whole GOP earlier
+        assert copy_start_times(keyframes, ranges) == [0.0, 6.95, None, None]
+    
+    def test_stream_copy_blocker(self, monkeypatch):
+        """Test stream copy is refused for unaligned starts and for exceeding max duration."""
+        keyframes = [6.95, 12.0]
+        monkeypatch.setattr(make_shorts, 'probe_keyframes', lambda path, times: keyframes)
+        ranges = [(7.0, 9.0), (12.0, 14.0)]
+        
+        assert stream_copy_blocker("p.mp4", self.VIDEO_INFO, ranges, 1080, 1920, 'libx264') is None
+        assert stream_copy_blocker("p.mp4", self.VIDEO_INFO, ranges, 1080, 1920, 'libx264',
+                                   max_duration=4.05) is None
+        assert 'max duration' in stream_copy_blocker("p.mp4", self.VIDEO_INFO, ranges, 1080, 1920,
+                                                     'libx264', max_duration=4.0)
+        assert 'resolution/codec' in stream_copy_blocker("p.mp4", self.VIDEO_INFO, ranges, 720, 1280,
+                                                         'libx264')
+        
+        keyframes[:] = [5.0, 10.0]  # 5s GOP: neither start is near a keyframe
+        assert 'range 1' in stream_copy_blocker("p.mp4", self.VIDEO_INFO, ranges, 1080, 1920, 'libx264')
+    
+    def test_stream_copy_falls_back_off_keyframe(self, tmp_path, monkeypatch, capsys):
+        """Test --stream-copy re-encodes when a range does not start at a keyframe."""
+        video = tmp_path / "p.mp4"
+        video.write_bytes(b"fake")
+        monkeypatch.setattr(make_shorts, 'get_video_info', lambda path, **kwargs: self.VIDEO_INFO)
+        monkeypatch.setattr(make_shorts, 'probe_keyframes', lambda path, times: [5.0, 10.0])
+        monkeypatch.setattr(sys, 'argv', ['make_shorts.py', str(video), '7', '9', '12', '14',
+                                          '--stream-copy', '--dry-run'])
+        
+        assert make_shorts.main() == 0
+        
+        out = capsys.readouterr().out
+        assert '-filter_complex' in out
+        assert '-c copy' not in out
+    
+    def test_build_split_command(self):
+        """Test that all segments are extracted by a single command."""
+        cmd, segment_paths = build_split_command("input.mp4", [(10.0, 25.0), (40.0, 45.0)], "tmp")
+        
+        expected = [
+            'ffmpeg',
+            '-ss', '10.0', '-t', '15.0', '-i', 'input.mp4',
+            '-ss', '40.0', '-t', '5.0', '-i', 'input.mp4',
+            '-map', '0:v:0', '-map', '0:a:0?',
+            '-c', 'copy', '-avoid_negative_ts', 'make_zero', segment_paths[0],
+            '-map', '1:v:0', '-map', '1:a:0?',
+            '-c', 'copy', '-avoid_negative_ts', 'make_zero', segment_paths[1]
+        ]
+        
+        assert cmd == expected
+        assert segment_paths == [str(Path("tmp") / "seg0.mp4"), str(Path("tmp") / "seg1.mp4")]
+    
+    def test_build_split_command_empty_ranges(self):
+        """Test split command with empty ranges."""
+        with pytest.raises(ValueError, match="No valid ranges to process"):
+            build_split_command("input.mp4", [], "tmp")
+    
+    def test_build_concat_command(self):
+        """Test building the concat demuxer command."""
+        cmd = build_concat_command("segments.txt", "output.mp4")
+        
+        assert cmd[:7] == ['ffmpeg', '-f', 'concat', '-safe', '0', '-i', 'segments.txt']
+        assert cmd[-1] == 'output.mp4'
+        assert 'copy' in cmd
+    
+    def test_write_concat_list(self, tmp_path):
+        """Test concat list file contents, including quote escaping."""
+        list_path = tmp_path / "segments.txt"
+        write_concat_list(["/tmp/seg0.mp4", "/tmp/it's.mp4"], str(list_path))
+        
+        assert list_path.read_text() == "file '/tmp/seg0.mp4'\nfile '/tmp/it'\\''s.mp4'\n"
+
+
+class TestVideoInfo:
+    """Test ffprobe output handling and caching."""
+    
+    PROBE_OUTPUT = b"""{
+        "streams": [
+            {"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080,
+             "avg_frame_rate": "30/1",
+             "side_data_list": [{"side_data_type": "Display Matrix", "rotation": -90}]},
+            {"codec_type": "audio", "codec_name": "aac"}
+        ],
+        "format": {"duration": "12.5"}
+    }"""
+    
+    @pytest.fixture
+    def fake_ffprobe(self, monkeypatch, tmp_path):
+        """Replace subprocess.run with a fake ffprobe and record the calls."""
+        calls = []
+        monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+        
+        def fake_run(cmd, **kwargs):
+            calls.append(cmd)
+            return subprocess.CompletedProcess(cmd, 0, stdout=self.PROBE_OUTPUT, stderr='')
+        
+        make_shorts._probe_video.cache_clear()
+        monkeypatch.setattr(make_shorts.subprocess, 'run', fake_run)
+        yield calls
+        make_shorts._probe_video.cache_clear()
+    
+    def test_get_video_info_parses_probe(self, fake_ffprobe, tmp_path):
+        """Test parsing of the trimmed ffprobe output."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        
+        info = get_video_info(str(video))
+        
+        assert info['duration'] == 12.5
+        assert info['has_audio'] is True
+        assert info['rotation'] == -90
+        assert (info['width'], info['height']) == (1920, 1080)
+        assert info['codec_name'] == 'h264'
+        assert '-show_entries' in fake_ffprobe[0]
+    
+    def test_get_video_info_cached(self, fake_ffprobe, tmp_path):
+        """Test that an unchanged file is probed only once."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        
+        get_video_info(str(video))
+        get_video_info(str(video))
+        assert len(fake_ffprobe) == 1
+        
+        # A modified file must be probed again
+        video.write_bytes(b"modified")
+        get_video_info(str(video))
+        assert len(fake_ffprobe) == 2
+    
+    def test_get_video_info_disk_cache(self, fake_ffprobe, tmp_path):
+        """Test that results survive the in-process cache through the disk cache."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        
+        info = get_video_info(str(video))
+        make_shorts._probe_video.cache_clear()
+        
+        assert get_video_info(str(video)) == info
+        assert len(fake_ffprobe) == 1
+        assert len(list(make_shorts.probe_cache_dir().glob('*.json'))) == 1
+        
+        # Bypassing the disk cache runs ffprobe again
+        make_shorts._probe_video.cache_clear()
+        get_video_info(str(video), use_cache=False)
+        assert len(fake_ffprobe) == 2
+    
+    def test_get_video_info_corrupt_disk_cache(self, fake_ffprobe, tmp_path):
+        """Test that an unreadable cache entry falls back to ffprobe."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        
+        get_video_info(str(video))
+        make_shorts._probe_video.cache_clear()
+        for cache_file in make_shorts.probe_cache_dir().glob('*.json'):
+            cache_file.write_text('{not json')
+        
+        assert get_video_info(str(video))['duration'] == 12.5
+        assert len(fake_ffprobe) == 2
+
+
+class TestNoProbe:
+    """Test skipping ffprobe."""
+    
+    @pytest.fixture
+    def no_ffprobe(self, monkeypatch):
+        """Fail the test if ffprobe would be run."""
+        def fail(path, **kwargs):
+            raise AssertionError("ffprobe must not run")
+        monkeypatch.setattr(make_shorts, 'get_video_info', fail)
+    
+    def test_dry_run_no_probe(self, no_ffprobe, tmp_path, monkeypatch, capsys):
+        """Test --dry-run --no-probe builds the command without ffprobe."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        monkeypatch.setattr(sys, 'argv', ['make_shorts.py', str(video), '10', '20',
+                                          '--dry-run', '--no-probe'])
+        
+        assert make_shorts.main() == 0
+        
+        out = capsys.readouterr().out
+        assert 'trim=start=10.0:end=20.0' in out
+        assert 'atrim=start=10.0:end=20.0' in out
+    
+    def test_assume_duration_validates_ranges(self, no_ffprobe, tmp_path, monkeypatch):
+        """Test --assume-duration still rejects ranges beyond the duration."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        monkeypatch.setattr(sys, 'argv', ['make_shorts.py', str(video), '10', '20',
+                                          '--dry-run', '--assume-duration', '15'])
+        
+        assert make_shorts.main() == 1
+    
+    def test_no_probe_requires_dry_run(self, tmp_path, monkeypatch):
+        """Test --no-probe is rejected for real runs."""
+        monkeypatch.setattr(sys, 'argv', ['make_shorts.py', 'video.mp4', '10', '20', '--no-probe'])
+        
+        with pytest.raises(SystemExit):
+            make_shorts.main()
+    
+    def test_no_probe_rejects_stream_copy(self, monkeypatch):
+        """Test stream copy, which must inspect the input, is rejected without ffprobe."""
+        for flags in (['--dry-run', '--no-probe'], ['--assume-duration', '60']):
+            monkeypatch.setattr(sys, 'argv', ['make_shorts.py', 'video.mp4', '10', '20',
+                                              '--stream-copy'] + flags)
+            
+            with pytest.raises(SystemExit):
+                make_shorts.main()
+
+
+class TestBatch:
+    """Test batch manifest loading and batch runs."""
+    
+    def test_load_batch_manifest(self, tmp_path):
+        """Test loading a valid manifest normalizes times to strings."""
+        manifest = tmp_path / "jobs.json"
+        manifest.write_text('[{"input": "a.mp4", "times": [10, "00:00:20"], "output": "a_short.mp4"}]')
+        
+        jobs = load_batch_manifest(str(manifest))
+        assert jobs == [{'input': 'a.mp4', 'times': ['10', '00:00:20'], 'output': 'a_short.mp4'}]
+    
+    def test_load_batch_manifest_invalid(self, tmp_path):
+        """Test invalid manifests are rejected."""
+        manifest = tmp_path / "jobs.json"
+        
+        manifest.write_text('[]')
+        with pytest.raises(ValueError, match="non-empty JSON list"):
+            load_batch_manifest(str(manifest))
+        
+        manifest.write_text('[{"input": "a.mp4", "times": [10, 20]}]')
+        with pytest.raises(ValueError, match="Batch job 1"):
+            load_batch_manifest(str(manifest))
+        
+        manifest.write_text('not json')
+        with pytest.raises(ValueError, match="Invalid batch manifest"):
+            load_batch_manifest(str(manifest))
+    
+    def test_run_batch_dry_run(self, tmp_path, monkeypatch, capsys):
+        """Test a dry-run batch prints one command per job."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        manifest = tmp_path / "jobs.json"
+        manifest.write_text(
+            f'[{{"input": "{video}", "times": [0, 5], "output": "one.mp4"}},'
+            f' {{"input": "{video}", "times": [5, 10], "output": "two.mp4"}}]'
+        )
+        
+        monkeypatch.setattr(make_shorts, 'get_video_info', lambda path, **kwargs: {
+            'duration': 60.0, 'has_audio': True, 'rotation': 0, 'video_streams': [{}]
+        })
+        args = make_shorts.build_parser().parse_args(['--batch', str(manifest), '--dry-run'])
+        
+        assert run_batch(str(manifest), args) == 0
+        
+        out = capsys.readouterr().out
+        assert 'one.mp4' in out
+        assert 'two.mp4' in out
+        assert 'trim=start=5.0:end=10.0' in out
+    
+    def test_run_batch_dry_run_continues_after_failure(self, tmp_path, monkeypatch, capsys):
+        """Test a failing dry-run job is reported without skipping later jobs."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        manifest = tmp_path / "jobs.json"
+        manifest.write_text(
+            f'[{{"input": "{tmp_path / "missing.mp4"}", "times": [0, 5], "output": "one.mp4"}},'
+            f' {{"input": "{video}", "times": [5, 10], "output": "two.mp4"}}]'
+        )
+        
+        monkeypatch.setattr(make_shorts, 'get_video_info', lambda path, **kwargs: {
+            'duration': 60.0, 'has_audio': True, 'rotation': 0, 'video_streams': [{}]
+        })
+        args = make_shorts.build_parser().parse_args(['--batch', str(manifest), '--dry-run'])
+        
+        assert run_batch(str(manifest), args) == 1
+        assert 'two.mp4' in capsys.readouterr().out
+    
+    def test_jobs_must_be_positive(self, monkeypatch):
+        """Test --jobs below 1 is rejected."""
+        monkeypatch.setattr(sys, 'argv', ['make_shorts.py', '--batch', 'jobs.json', '--jobs', '-1'])
+        
+        with pytest.raises(SystemExit):
+            make_shorts.main()
+
+
 if __name__ == '__main__':
     # Run tests if script is executed directly
     pytest.main([__file__, '-v'])
\ No newline at end of file
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Test script for transcribe.py subtitle generation.
+"""
+
+import io
+import json
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Add the parent directory to the path so we can import transcribe
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import transcribe
+from transcribe import Word, format_srt_time, split_text_into_lines, yield_words
+
+
+def words(*spans):
+    """Build Words named w1, w2, ... from (start, end) pairs."""
+    return [Word(f"w{i}", start, end) for i, (start, end) in enumerate(spans, 1)]
+
+
+def line_texts(data, **kwargs):
+    """Return the text of each line split_text_into_lines yields."""
+    return [line["word"] for line in split_text_into_lines(data, **kwargs)]
+
+
+class TestResolveModelOptions:
+    """Test resolving the auto device and compute type."""
+    
+    def test_auto_on_cuda(self, monkeypatch):
+        """Test auto picks CUDA with float16 when a GPU is available."""
+        monkeypatch.setattr(transcribe, 'cuda_available', lambda: True)
+        
+        assert transcribe.resolve_model_options() == ("cuda", "float16")
+        assert transcribe.resolve_model_options("cuda", "auto") == ("cuda", "float16")
+    
+    def test_auto_on_cpu(self, monkeypatch):
+        """Test auto picks the CPU with int8 without a GPU."""
+        monkeypatch.setattr(transcribe, 'cuda_available', lambda: False)
+        
+        assert transcribe.resolve_model_options() == ("cpu", "int8")
+        assert transcribe.resolve_model_options("cpu", "auto") == ("cpu", "int8")
+    
+    def test_explicit_values_pass_through(self, monkeypatch):
+        """Test explicit device and compute type are used unchanged."""
+        monkeypatch.setattr(transcribe, 'cuda_available', lambda: True)
+        
+        assert transcribe.resolve_model_options("cpu", "float32") == ("cpu", "float32")
+        assert transcribe.resolve_model_options("cuda", "int8_float16") == ("cuda", "int8_float16")
+        assert transcribe.resolve_model_options("auto", "int8") == ("cuda", "int8")
+
+
+class TestSaveAudio:
+    """Test writing decoded audio back to WAV."""
+    
+    def test_save_audio_round_trip(self, tmp_path):
+        """Test the WAV holds the original 16kHz mono int16 samples."""
+        samples = np.array([0, 1, -1, 16384, 32767, -32768], dtype=np.int16)
+        audio = samples.astype(np.float32) / 32768.0  # as load_audio returns it
+        path = tmp_path / "audio.wav"
+        
+        transcribe.save_audio(audio, path)
+        
+        with wave.open(str(path), 'rb') as f:
+            assert (f.getnchannels(), f.getsampwidth(), f.getframerate()) == (1, 2, 16000)
+            assert np.array_equal(np.frombuffer(f.readframes(f.getnframes()), '<i2'), samples)
+
+
+class TestFormatSrtTime:
+    """Test SRT timestamp formatting."""
+    
+    def test_format_srt_time(self):
+        """Test formatting seconds as HH:MM:SS,mmm."""
+        assert format_srt_time(0) == "00:00:00,000"
+        assert format_srt_time(3723.5) == "01:02:03,500"
+    
+    def test_format_srt_time_rounds_milliseconds(self):
+        """Test rounding to the nearest millisecond, carrying into seconds and minutes."""
+        assert format_srt_time(1.001) == "00:00:01,001"
+        assert format_srt_time(59.9995) == "00:01:00,000"
+
+
+class TestSplitTextIntoLines:
+    """Test splitting word-level timestamps into subtitle lines."""
+    
+    def test_duration_spans_gaps_between_words(self):
+        """Test that line duration runs from the first word's start to the last word's end."""
+        # Summed word durations are only 1.8s, but the line spans 2.6s by w3
+        data = words((0.0, 0.5), (1.0, 1.5), (2.0, 2.6), (2.7, 2.9))
+        
+        assert line_texts(data, max_words=10, max_duration=2.5) == ["w1 w2 w3", "w4"]
+    
+    def test_max_words(self):
+        """Test splitting after max_words words."""
+        data = words((0.0, 0.2), (0.2, 0.4), (0.4, 0.6), (0.6, 0.8))
+        
+        assert line_texts(data, max_words=3) == ["w1 w2 w3", "w4"]
+        assert line_texts(data, max_words=2) == ["w1 w2", "w3 w4"]
+    
+    def test_max_chars(self):
+        """Test splitting once the joined line exceeds max_chars."""
+        data = [Word("abcdefghij", 0.0, 0.2), Word("klmnopqrst", 0.2, 0.4), Word("uvwxyz", 0.4, 0.6)]
+        
+        # "abcdefghij klmnopqrst" is 21 characters
+        assert line_texts(data, max_chars=21) == ["abcdefghij klmnopqrst uvwxyz"]
+        assert line_texts(data, max_chars=20) == ["abcdefghij klmnopqrst", "uvwxyz"]
+    
+    def test_max_gap(self):
+        """Test splitting on a pause longer than max_gap."""
+        data = words((0.0, 0.2), (2.0, 2.2), (2.3, 2.4))
+        
+        lines = list(split_text_into_lines(data, max_gap=1.5))
+        
+        assert [line["word"] for line in lines] == ["w1 w2", "w3"]
+        assert (lines[0]["start"], lines[0]["end"]) == (0.0, 2.2)
+        assert lines[0]["textcontents"] == data[:2]
+        
+        assert line_texts(data, max_gap=2.0) == ["w1 w2 w3"]
+    
+    def test_streamed_words(self):
+        """Test that words can be consumed from a generator."""
+        data = words((0.0, 0.2), (0.2, 0.4), (0.4, 0.6), (0.6, 0.8))
+        
+        assert line_texts(iter(data)) == line_texts(data)
+        assert line_texts(iter([])) == []
+
+
+class FakeModel:
+    """Stand-in for WhisperModel that records transcribe() options."""
+    
+    def __init__(self):
+        self.options = None
+    
+    def transcribe(self, audio, **options):
+        self.options = options
+        segment = SimpleNamespace(words=[SimpleNamespace(word=" hola", start=0.0, end=0.4)])
+        return iter([segment]), None
+
+
+class TestYieldWords:
+    """Test choosing the transcription pipeline."""
+    
+    def test_no_vad_transcribes_sequentially(self, monkeypatch):
+        """Test that batching is skipped without VAD, which the batched pipeline needs."""
+        def fail_batched(model):
+            raise AssertionError("BatchedInferencePipeline used without VAD")
+        
+        monkeypatch.setattr(transcribe, 'BatchedInferencePipeline', fail_batched)
+        model = FakeModel()
+        
+        assert list(yield_words(model, None, batch_size=8, vad_filter=False)) == [Word(" hola", 0.0, 0.4)]
+        assert model.options == {'word_timestamps': True, 'vad_filter': False}
+    
+    def test_vad_uses_batched_pipeline(self, monkeypatch):
+        """Test that VAD with batch_size > 1 goes through the batched pipeline."""
+        model = FakeModel()
+        batched = SimpleNamespace(
+            transcribe=lambda audio, batch_size, **options: model.transcribe(audio, **options)
+        )
+        monkeypatch.setattr(transcribe, 'BatchedInferencePipeline', lambda model: batched)
+        
+        assert list(yield_words(model, None, batch_size=8)) == [Word(" hola", 0.0, 0.4)]
+        assert model.options['vad_filter'] is True
+        assert model.options['vad_parameters'] == {'min_silence_duration_ms': 500}
+
+
+class TestServe:
+    """Test the --serve job loop."""
+    
+    @pytest.fixture
+    def run_serve(self, monkeypatch, capsys):
+        """Run serve() over the given stdin lines; returns (result objects, captured stderr)."""
+        monkeypatch.setattr(transcribe, 'load_audio', lambda path: None)
+        
+        def run(*lines):
+            monkeypatch.setattr(sys, 'stdin', io.StringIO(''.join(line + '\n' for line in lines)))
+            transcribe.serve(FakeModel(), batch_size=1)
+            captured = capsys.readouterr()
+            return [json.loads(line) for line in captured.out.splitlines()], captured.err
+        
+        return run
+    
+    def test_serve_job(self, tmp_path, run_serve):
+        """Test a job writes the SRT and reports success on stdout."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        srt = tmp_path / "out.srt"
+        
+        results, err = run_serve(json.dumps({"video": str(video), "srt": str(srt)}))
+        
+        assert results == [{"video": str(video), "srt": str(srt), "ok": True}]
+        assert srt.read_text(encoding='utf-8') == "1\n00:00:00,000 --> 00:00:00,400\n hola\n\n"
+    
+    def test_serve_default_srt_path(self, tmp_path, run_serve):
+        """Test the SRT defaults to the video path with a .srt suffix."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        
+        results, err = run_serve(json.dumps({"video": str(video)}))
+        
+        assert results[0]["srt"] == str(tmp_path / "video.srt")
+        assert (tmp_path / "video.srt").exists()
+    
+    def test_serve_errors_keep_serving(self, tmp_path, run_serve):
+        """Test bad jobs are reported one line each and later jobs still run."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        
+        results, err = run_serve(
+            json.dumps({"video": str(tmp_path / "missing.mp4")}),
+            "not json",
+            "",
+            json.dumps(["not", "an", "object"]),
+            json.dumps({"video": str(video)}),
+        )
+        
+        assert len(results) == 4
+        assert results[0]["ok"] is False
+        assert results[0]["video"] == str(tmp_path / "missing.mp4")
+        assert "not found" in results[0]["error"]
+        assert results[1] == {"video": None, "ok": False, "error": results[1]["error"]}
+        assert results[2]["ok"] is False and results[2]["video"] is None
+        assert results[3]["ok"] is True
+    
+    def test_serve_progress_goes_to_stderr(self, tmp_path, run_serve):
+        """Test stdout carries only result lines, with progress on stderr."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        
+        results, err = run_serve(json.dumps({"video": str(video)}))
+        
+        assert len(results) == 1  # every stdout line parsed as a JSON result
+        assert "Transcribing audio..." in err
+        assert "SRT file saved" in err
+
+
+class TestMain:
+    """Test the single-video command line flow."""
+    
+    def test_decode_error_does_not_wait_for_model(self, tmp_path, monkeypatch, capsys):
+        """Test a failing audio decode exits while the model is still loading."""
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"fake")
+        loading = threading.Event()
+        release = threading.Event()
+        
+        def slow_load_model(*args):
+            loading.set()
+            release.wait(10)
+            return FakeModel()
+        
+        def no_audio(path):
+            loading.wait(1)
+            raise RuntimeError("no audio stream")
+        
+        monkeypatch.setattr(transcribe, 'load_model', slow_load_model)
+        monkeypatch.setattr(transcribe, 'load_audio', no_audio)
+        monkeypatch.setattr(sys, 'argv', ['transcribe.py', str(video)])
+        
+        started = time.monotonic()
+        try:
+            with pytest.raises(SystemExit) as exc:
+                transcribe.main()
+            elapsed = time.monotonic() - started
+        finally:
+            release.set()
+        
+        assert exc.value.code == 1
+        assert elapsed < 2
+        assert "no audio stream" in capsys.readouterr().err
@@ -5,15 +5,32 @@ and concatenate them into a single vertical (phone-ratio) MP4 suitable for YouTu
 """
 
 import argparse
+import collections
+import functools
+import hashlib
 import json
 import logging
+import os
 import re
 import subprocess
 import sys
 import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict, Any
 
+# orjson parses ffprobe's bytes output directly and much faster; optional
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
+
+
+log = logging.getLogger(__name__)
+
+# HH:MM:SS[.ms] time format accepted by parse_time
+_TIME_RE = re.compile(r'^(\d{1,2}):(\d{2}):(\d{2})(?:\.(\d+))?$')
+
 
 def setup_logging(verbose: bool = False) -> None:
     """Setup logging configuration."""
@@ -35,28 +52,27 @@ def parse_time(time_str: str) -> float:
     Returns:
         float: Time in seconds
     """
-    # Try parsing as plain number first
+    # Only HH:MM:SS[.ms] contains ':'; deciding up front avoids raising and
+    # catching a ValueError from float() on every HH:MM:SS token
+    if ':' in time_str:
+        match = _TIME_RE.match(time_str)
+        if not match:
+            raise ValueError(f"Invalid time format: '{time_str}'. Use HH:MM:SS[.ms] or seconds as number.")
+        
+        hours, minutes, seconds, milliseconds = match.groups()
+        total_seconds = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+        
+        if milliseconds:
+            # Convert milliseconds to decimal seconds
+            return total_seconds + float(f"0.{milliseconds}")
+        
+        return float(total_seconds)
+    
+    # Plain number of seconds
     try:
         return float(time_str)
     except ValueError:
-        pass
-    
-    # Try parsing as HH:MM:SS[.ms] format
-    time_pattern = r'^(\d{1,2}):(\d{2}):(\d{2})(?:\.(\d+))?$'
-    match = re.match(time_pattern, time_str)
-    
-    if not match:
         raise ValueError(f"Invalid time format: '{time_str}'. Use HH:MM:SS[.ms] or seconds as number.")
-    
-    hours, minutes, seconds, milliseconds = match.groups()
-    total_seconds = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
-    
-    if milliseconds:
-        # Convert milliseconds to decimal seconds
-        ms_decimal = float(f"0.{milliseconds}")
-        total_seconds += ms_decimal
-    
-    return float(total_seconds)
 
 
 def parse_time_pairs(time_tokens: List[str]) -> List[Tuple[float, float]]:
@@ -73,40 +89,121 @@ def parse_time_pairs(time_tokens: List[str]) -> List[Tuple[float, float]]:
         raise ValueError(f"Odd number of time tokens ({len(time_tokens)}). Must provide start/end pairs.")
     
     pairs = []
-    for i in range(0, len(time_tokens), 2):
-        start = parse_time(time_tokens[i])
-        end = parse_time(time_tokens[i + 1])
-        
-        if start >= end:
-            if start == end:
-                logging.warning(f"Skipping zero-length clip: {start} == {end}")
-                continue
-            else:
-                raise ValueError(f"Invalid range: start ({start}) >= end ({end})")
-        
-        pairs.append((start, end))
+    for start_token, end_token in zip(time_tokens[::2], time_tokens[1::2]):
+        pair = _parse_range(start_token, end_token)
+        if pair is not None:
+            pairs.append(pair)
     
     return pairs
 
 
-def get_video_info(input_path: str) -> Dict[str, Any]:
+def _parse_range(start_token: str, end_token: str) -> Optional[Tuple[float, float]]:
+    """Parse one start/end token pair; returns None for zero-length ranges."""
+    start = parse_time(start_token)
+    end = parse_time(end_token)
+    
+    if start >= end:
+        if start == end:
+            log.warning("Skipping zero-length clip: %s == %s", start, end)
+            return None
+        raise ValueError(f"Invalid range: start ({start}) >= end ({end})")
+    
+    return start, end
+
+
+# Only the ffprobe fields get_video_info actually reads
+PROBE_ENTRIES = (
+    'stream=codec_type,codec_name,width,height,avg_frame_rate'
+    ':stream_side_data=side_data_type,rotation'
+    ':format=duration'
+)
+
+
+def get_video_info(input_path: str, use_cache: bool = True) -> Dict[str, Any]:
     """
     Get video information using ffprobe.
     
+    Results are cached per process, keyed by path, modification time and
+    size, so probing the same unchanged file again skips the subprocess.
+    With use_cache, results are also kept on disk (see probe_cache_dir) so
+    later runs on an unchanged file skip ffprobe too.
+    
     Returns:
         Dict containing duration, has_audio, rotation, etc.
     """
+    stat = os.stat(input_path)
+    return dict(_probe_video(input_path, stat.st_mtime_ns, stat.st_size, use_cache))
+
+
+def probe_cache_dir() -> Path:
+    """Directory holding cached ffprobe results ($XDG_CACHE_HOME/make_shorts)."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'make_shorts'
+
+
+def _probe_cache_path(input_path: str) -> Path:
+    """Cache file for input_path, named after a hash of its absolute path."""
+    key = hashlib.sha1(os.path.abspath(input_path).encode('utf-8')).hexdigest()
+    return probe_cache_dir() / f"{key}.json"
+
+
+def _read_probe_cache(input_path: str, mtime_ns: int, size: int) -> Optional[Dict[str, Any]]:
+    """Return cached video info if it was recorded for this exact mtime and size."""
+    try:
+        entry = _json.loads(_probe_cache_path(input_path).read_bytes())
+    except (OSError, ValueError):
+        return None
+    
+    if (not isinstance(entry, dict) or entry.get('mtime_ns') != mtime_ns
+            or entry.get('size') != size or not isinstance(entry.get('info'), dict)):
+        return None
+    
+    return entry['info']
+
+
+def _write_probe_cache(input_path: str, mtime_ns: int, size: int, info: Dict[str, Any]) -> None:
+    """Store video info on disk; failures are logged and otherwise ignored."""
+    cache_path = _probe_cache_path(input_path)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent runs never read a partial file
+        with tempfile.NamedTemporaryFile('w', dir=cache_path.parent, suffix='.tmp',
+                                         delete=False, encoding='utf-8') as f:
+            json.dump({'mtime_ns': mtime_ns, 'size': size, 'info': info}, f)
+        os.replace(f.name, cache_path)
+    except OSError as e:
+        log.debug("Could not write probe cache %s: %s", cache_path, e)
+
+
+@functools.lru_cache(maxsize=32)
+def _probe_video(input_path: str, mtime_ns: int, size: int, use_cache: bool = True) -> Dict[str, Any]:
+    """Probe input_path, going through the on-disk cache when use_cache is set."""
+    if use_cache:
+        info = _read_probe_cache(input_path, mtime_ns, size)
+        if info is not None:
+            return info
+    
+    info = _run_ffprobe(input_path)
+    
+    if use_cache:
+        _write_probe_cache(input_path, mtime_ns, size, info)
+    
+    return info
+
+
+def _run_ffprobe(input_path: str) -> Dict[str, Any]:
+    """Run ffprobe on input_path and extract the fields used by this script."""
     cmd = [
-        'ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams',
+        'ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_entries', PROBE_ENTRIES,
         input_path
     ]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        data = json.loads(result.stdout)
+        result = subprocess.run(cmd, capture_output=True, check=True)
+        data = _json.loads(result.stdout)
     except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"ffprobe failed: {e.stderr}")
-    except json.JSONDecodeError as e:
+        raise RuntimeError(f"ffprobe failed: {e.stderr.decode('utf-8', 'replace')}")
+    except json.JSONDecodeError as e:  # orjson.JSONDecodeError subclasses it
         raise RuntimeError(f"Failed to parse ffprobe output: {e}")
     
     # Extract duration
@@ -126,6 +223,14 @@ def get_video_info(input_path: str) -> Dict[str, Any]:
             audio_streams.append(stream)
             has_audio = True
     
+    # Capture the first video stream's geometry and codec
+    width = height = codec_name = avg_frame_rate = None
+    if video_streams:
+        width = video_streams[0].get('width')
+        height = video_streams[0].get('height')
+        codec_name = video_streams[0].get('codec_name')
+        avg_frame_rate = video_streams[0].get('avg_frame_rate')
+    
     # Check for rotation metadata
     rotation = 0
     if video_streams:
@@ -142,11 +247,35 @@ def get_video_info(input_path: str) -> Dict[str, Any]:
         'duration': duration,
         'has_audio': has_audio,
         'rotation': rotation,
+        'width': width,
+        'height': height,
+        'codec_name': codec_name,
+        'avg_frame_rate': avg_frame_rate,
         'video_streams': video_streams,
         'audio_streams': audio_streams
     }
 
 
+def assumed_video_info(duration: float) -> Dict[str, Any]:
+    """
+    Build a stand-in for get_video_info when ffprobe is skipped.
+    
+    Assumes an audio stream and no rotation. Source dimensions and codec are
+    unknown, so stream copy is never possible.
+    """
+    return {
+        'duration': duration,
+        'has_audio': True,
+        'rotation': 0,
+        'width': None,
+        'height': None,
+        'codec_name': None,
+        'avg_frame_rate': None,
+        'video_streams': [],
+        'audio_streams': []
+    }
+
+
 def validate_and_clamp_ranges(ranges: List[Tuple[float, float]], duration: float, clamp: bool = False) -> List[Tuple[float, float]]:
     """
     Validate time ranges against video duration.
@@ -161,36 +290,147 @@ def validate_and_clamp_ranges(ranges: List[Tuple[float, float]], duration: float
     """
     validated_ranges = []
     
-    for i, (start, end) in enumerate(ranges):
-        original_start, original_end = start, end
-        
-        if not clamp:
-            if start < 0 or end > duration:
-                raise ValueError(f"Range {i+1} ({start}, {end}) is outside video duration (0, {duration})")
+    for number, (start, end) in enumerate(ranges, 1):
+        validated = _check_range(number, start, end, duration, clamp)
+        if validated is not None:
+            validated_ranges.append(validated)
+    
+    return validated_ranges
+
+
+def _check_range(number: int, start: float, end: float, duration: float,
+                 clamp: bool) -> Optional[Tuple[float, float]]:
+    """Validate one range (1-based number) against duration; returns None if clamped away."""
+    if not clamp:
+        if start < 0 or end > duration:
+            raise ValueError(f"Range {number} ({start}, {end}) is outside video duration (0, {duration})")
+        return start, end
+    
+    # Clamp to valid bounds
+    clamped_start = max(0, start)
+    clamped_end = min(duration, end)
+    
+    if (clamped_start, clamped_end) != (start, end):
+        log.warning("Clamped range %d: (%s, %s) -> (%s, %s)", number, start, end, clamped_start, clamped_end)
+    
+    # Skip if range becomes invalid after clamping
+    if clamped_start >= clamped_end:
+        log.warning("Skipping invalid range after clamping: (%s, %s)", clamped_start, clamped_end)
+        return None
+    
+    return clamped_start, clamped_end
+
+
+def _append_range(ranges: List[Tuple[float, float]], start: float, end: float,
+                  gap_tolerance: Optional[float]) -> float:
+    """
+    Append a range, merging it into the last one when gap_tolerance allows.
+    
+    Returns:
+        Duration in seconds added to the total
+    """
+    if gap_tolerance is not None and ranges:
+        prev_start, prev_end = ranges[-1]
+        if prev_start <= start <= prev_end + gap_tolerance:
+            new_end = max(prev_end, end)
+            ranges[-1] = (prev_start, new_end)
+            return new_end - prev_end
+    
+    ranges.append((start, end))
+    return end - start
+
+
+def _cap_ranges(ranges: List[Tuple[float, float]], total_duration: float,
+                max_duration: float) -> bool:
+    """
+    Shorten the last range so the total ends exactly at max_duration.
+    
+    Returns:
+        True once the cap is reached and no further ranges should be added
+    """
+    if total_duration < max_duration:
+        return False
+    
+    excess = total_duration - max_duration
+    if excess > 0:
+        log.warning("Ranges exceed max duration (%ss); truncating", max_duration)
+        start, end = ranges[-1]
+        if end - excess > start:
+            ranges[-1] = (start, end - excess)
         else:
-            # Clamp to valid bounds
-            start = max(0, start)
-            end = min(duration, end)
-            
-            if (start, end) != (original_start, original_end):
-                logging.warning(f"Clamped range {i+1}: ({original_start}, {original_end}) -> ({start}, {end})")
-            
-            # Skip if range becomes invalid after clamping
-            if start >= end:
-                logging.warning(f"Skipping invalid range after clamping: ({start}, {end})")
-                continue
+            ranges.pop()
+    return True
+
+
+def process_ranges(time_tokens: List[str], duration: float, clamp: bool = False,
+                   max_duration: Optional[float] = None,
+                   merge_gap: Optional[float] = None) -> List[Tuple[float, float]]:
+    """
+    Parse, validate, merge and truncate time tokens in a single pass.
+    
+    Parses and validates like parse_time_pairs and validate_and_clamp_ranges,
+    merges each range into the previous one when merge_gap is set, and stops
+    reading tokens as soon as max_duration is reached.
+    
+    Args:
+        time_tokens: List of time strings (must be even number)
+        duration: Video duration in seconds
+        clamp: If True, clamp ranges to valid bounds instead of failing
+        max_duration: Maximum total duration in seconds
+        merge_gap: Merge ranges starting within this many seconds of the previous one's end
+    
+    Returns:
+        List of (start, end) tuples in seconds
+    """
+    if len(time_tokens) % 2 != 0:
+        raise ValueError(f"Odd number of time tokens ({len(time_tokens)}). Must provide start/end pairs.")
+    
+    ranges = []
+    total_duration = 0.0
+    number = 0
+    
+    for start_token, end_token in zip(time_tokens[::2], time_tokens[1::2]):
+        pair = _parse_range(start_token, end_token)
+        if pair is None:
+            continue
+        
+        number += 1
+        validated = _check_range(number, pair[0], pair[1], duration, clamp)
+        if validated is None:
+            continue
+        
+        total_duration += _append_range(ranges, validated[0], validated[1], merge_gap)
         
-        validated_ranges.append((start, end))
+        if max_duration and _cap_ranges(ranges, total_duration, max_duration):
+            break
     
-    return validated_ranges
+    return ranges
 
 
-def check_overlapping_ranges(ranges: List[Tuple[float, float]]) -> None:
-    """Check for overlapping ranges and warn user."""
-    for i, (start1, end1) in enumerate(ranges):
-        for j, (start2, end2) in enumerate(ranges[i+1:], i+1):
-            if not (end1 <= start2 or end2 <= start1):  # Ranges overlap
-                logging.warning(f"Overlapping ranges detected: range {i+1} ({start1}, {end1}) and range {j+1} ({start2}, {end2})")
+def check_overlapping_ranges(ranges: List[Tuple[float, float]],
+                             merge_gap: Optional[float] = None) -> None:
+    """
+    Check for overlapping ranges and warn user.
+    
+    Sorts by start time and sweeps once, comparing each range against the
+    furthest-reaching range seen so far. Range numbers in warnings refer to
+    the original (1-based) order. The --merge-adjacent hint is only given
+    when merging is off (merge_gap is None).
+    """
+    indexed = sorted(enumerate(ranges, 1), key=lambda item: item[1][0])
+    
+    overlaps = False
+    furthest = None  # (index, range) of the range reaching furthest so far
+    for index, current in indexed:
+        if furthest is not None and current[0] < furthest[1][1]:  # Ranges overlap
+            overlaps = True
+            (i, range1), (j, range2) = sorted([furthest, (index, current)])
+            log.warning("Overlapping ranges detected: range %d %s and range %d %s", i, range1, j, range2)
+        if furthest is None or current[1] > furthest[1][1]:
+            furthest = (index, current)
+    
+    if overlaps and merge_gap is None:
+        log.warning("Use --merge-adjacent to merge overlapping ranges that follow each other")
 
 
 def parse_resolution(resolution_str: str) -> Tuple[int, int]:
@@ -202,6 +442,120 @@ def parse_resolution(resolution_str: str) -> Tuple[int, int]:
         raise ValueError(f"Invalid resolution format: '{resolution_str}'. Use WIDTHxHEIGHT (e.g., 1080x1920)")
 
 
+# Codec names (as reported by ffprobe) produced by the supported encoders
+ENCODER_CODEC_NAMES = {
+    'libx264': 'h264',
+    'libx265': 'hevc',
+}
+
+
+def can_stream_copy(video_info: Dict[str, Any], target_width: int, target_height: int,
+                    codec_v: str) -> bool:
+    """
+    Check whether the clips can be cut with stream copy instead of re-encoding.
+    
+    Stream copy is only possible when the source already has the target
+    dimensions (so every scale mode is a no-op), carries no rotation metadata
+    and is encoded with the same codec the encoder would produce.
+    
+    Args:
+        video_info: Dict returned by get_video_info
+        target_width: Target video width
+        target_height: Target video height
+        codec_v: Video encoder that would be used for re-encoding
+    
+    Returns:
+        True if the source can be copied without re-encoding
+    """
+    if not video_info.get('video_streams'):
+        return False
+    
+    return (
+        video_info.get('width') == target_width
+        and video_info.get('height') == target_height
+        and video_info.get('rotation', 0) == 0
+        and video_info.get('codec_name') == ENCODER_CODEC_NAMES.get(codec_v)
+    )
+
+
+# Largest gap in seconds between a keyframe and the range start still stream copied
+KEYFRAME_TOLERANCE = 0.1
+
+# Slack for pts_time rounding when a keyframe sits exactly on a range start
+KEYFRAME_EPSILON = 0.001
+
+
+def probe_keyframes(input_path: str, times: List[float]) -> List[float]:
+    """
+    Return the video keyframe times up to KEYFRAME_TOLERANCE before each of times.
+    
+    A single ffprobe run decodes only keyframes (-skip_frame nokey) and only
+    reads a short interval around each time (-read_intervals).
+    """
+    intervals = ','.join(
+        f'{max(0.0, t - KEYFRAME_TOLERANCE)}%{t + KEYFRAME_EPSILON}' for t in times
+    )
+    cmd = [
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0', '-skip_frame', 'nokey',
+        '-show_entries', 'frame=pts_time', '-of', 'csv=p=0',
+        '-read_intervals', intervals, input_path
+    ]
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffprobe failed: {e.stderr}")
+    
+    keyframes = []
+    for line in result.stdout.splitlines():
+        try:
+            keyframes.append(float(line.strip().strip(',')))
+        except ValueError:
+            continue  # N/A or empty entries
+    return keyframes
+
+
+def copy_start_times(keyframes: List[float],
+                     ranges: List[Tuple[float, float]]) -> List[Optional[float]]:
+    """
+    Map each range to the keyframe a stream-copied cut would start from.
+    
+    Seeking with -c copy starts at the last keyframe at or before the range
+    start; None means that keyframe is more than KEYFRAME_TOLERANCE earlier.
+    """
+    starts = []
+    for start, _ in ranges:
+        candidates = [k for k in keyframes if start - KEYFRAME_TOLERANCE <= k <= start + KEYFRAME_EPSILON]
+        starts.append(max(candidates) if candidates else None)
+    return starts
+
+
+def stream_copy_blocker(input_path: str, video_info: Dict[str, Any],
+                        ranges: List[Tuple[float, float]], target_width: int, target_height: int,
+                        codec_v: str, max_duration: Optional[float] = None) -> Optional[str]:
+    """
+    Explain why ranges cannot be stream copied, or return None if they can.
+    
+    Besides can_stream_copy, every range must start within KEYFRAME_TOLERANCE
+    after a keyframe, and with max_duration the keyframe-aligned clips must
+    still fit within it.
+    """
+    if not can_stream_copy(video_info, target_width, target_height, codec_v):
+        return "input does not match target resolution/codec"
+    
+    copy_starts = copy_start_times(probe_keyframes(input_path, [s for s, _ in ranges]), ranges)
+    for number, keyframe in enumerate(copy_starts, 1):
+        if keyframe is None:
+            return f"range {number} does not start within {KEYFRAME_TOLERANCE}s after a keyframe"
+    
+    if max_duration:
+        copied = sum(end - min(keyframe, start) for keyframe, (start, end) in zip(copy_starts, ranges))
+        if copied > max_duration:
+            return f"keyframe-aligned clips ({copied:.2f}s) would exceed max duration ({max_duration}s)"
+    
+    return None
+
+
 def build_audio_filter_complex(ranges: List[Tuple[float, float]]) -> str:
     """
     Build ffmpeg filter_complex string for concatenating multiple audio clips.
@@ -262,35 +616,38 @@ def build_filter_complex(ranges: List[Tuple[float, float]], target_width: int, t
     else:
         raise ValueError(f"Invalid scale mode: {scale_mode}")
     
-    filter_parts = []
-    video_labels = []
-    audio_labels = []
+    # A single range needs no concat node: trim straight into the output labels
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        filter_complex = f"[0:v]trim=start={start}:end={end},setpts=PTS-STARTPTS,{scale_filter}[outv]"
+        if has_audio:
+            filter_complex += f"; [0:a]atrim=start={start}:end={end},asetpts=PTS-STARTPTS[outa]"
+        return filter_complex
+    
+    # One chain per segment (two with audio) plus the concat filter
+    n_segments = len(ranges)
+    chains_per_segment = 2 if has_audio else 1
+    filter_parts = [None] * (chains_per_segment * n_segments + 1)
     
     # Create filter chains for each segment
+    pos = 0
     for i, (start, end) in enumerate(ranges):
         # Video filter chain
-        video_filter = f"[0:v]trim=start={start}:end={end},setpts=PTS-STARTPTS,{scale_filter}[v{i}]"
-        filter_parts.append(video_filter)
-        video_labels.append(f"[v{i}]")
+        filter_parts[pos] = f"[0:v]trim=start={start}:end={end},setpts=PTS-STARTPTS,{scale_filter}[v{i}]"
+        pos += 1
         
         # Audio filter chain (if audio exists)
         if has_audio:
-            audio_filter = f"[0:a]atrim=start={start}:end={end},asetpts=PTS-STARTPTS[a{i}]"
-            filter_parts.append(audio_filter)
-            audio_labels.append(f"[a{i}]")
+            filter_parts[pos] = f"[0:a]atrim=start={start}:end={end},asetpts=PTS-STARTPTS[a{i}]"
+            pos += 1
     
     # Concatenation filter
-    n_segments = len(ranges)
     if has_audio:
-        concat_inputs = []
-        for i in range(n_segments):
-            concat_inputs.extend([f"[v{i}]", f"[a{i}]"])
-        concat_filter = f"{''.join(concat_inputs)}concat=n={n_segments}:v=1:a=1[outv][outa]"
+        concat_inputs = ''.join(f"[v{i}][a{i}]" for i in range(n_segments))
+        filter_parts[pos] = f"{concat_inputs}concat=n={n_segments}:v=1:a=1[outv][outa]"
     else:
-        concat_inputs = ''.join(video_labels)
-        concat_filter = f"{concat_inputs}concat=n={n_segments}:v=1:a=0[outv]"
-    
-    filter_parts.append(concat_filter)
+        concat_inputs = ''.join(f"[v{i}]" for i in range(n_segments))
+        filter_parts[pos] = f"{concat_inputs}concat=n={n_segments}:v=1:a=0[outv]"
     
     return '; '.join(filter_parts)
 
@@ -310,21 +667,117 @@ def build_audio_ffmpeg_command(input_path: str, output_path: str, filter_complex
     return cmd
 
 
+# Hardware H.264 encoders, in auto-detection order
+HW_ENCODERS = {
+    'nvenc': 'h264_nvenc',
+    'vaapi': 'h264_vaapi',
+    'videotoolbox': 'h264_videotoolbox',
+    'qsv': 'h264_qsv',
+}
+
+VAAPI_DEVICE = '/dev/dri/renderD128'
+
+
+def _hwenc_works(hwenc: str) -> bool:
+    """Encode one blank frame to check that the encoder has usable hardware behind it."""
+    cmd = ['ffmpeg', '-hide_banner', '-v', 'error']
+    if hwenc == 'vaapi':
+        cmd.extend(['-vaapi_device', VAAPI_DEVICE])
+    cmd.extend(['-f', 'lavfi', '-i', 'color=size=256x256:duration=0.1', '-frames:v', '1'])
+    if hwenc == 'vaapi':
+        cmd.extend(['-vf', 'format=nv12,hwupload'])
+    cmd.extend(['-c:v', HW_ENCODERS[hwenc], '-f', 'null', '-'])
+    
+    try:
+        return subprocess.run(cmd, capture_output=True).returncode == 0
+    except OSError:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def detect_hwenc() -> Optional[str]:
+    """
+    Detect a usable hardware H.264 encoder.
+    
+    ffmpeg builds often list hardware encoders without the matching device
+    being present, so each listed encoder is verified with a one-frame encode.
+    
+    Returns:
+        Key of HW_ENCODERS for the first working encoder, or None
+    """
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    
+    for hwenc, encoder in HW_ENCODERS.items():
+        if encoder in result.stdout and _hwenc_works(hwenc):
+            return hwenc
+    
+    return None
+
+
+def crf_to_q(crf: int) -> int:
+    """Map a CRF value (0-51, lower is better) to VideoToolbox quality (1-100, higher is better)."""
+    return round(100 - min(max(crf, 0), 51) * 99 / 51)
+
+
+def build_video_encoder_args(codec_v: str, crf: int, preset: str,
+                             hwenc: Optional[str] = None, threads: Optional[int] = None) -> List[str]:
+    """Build video encoder options, translating CRF/preset for hardware encoders."""
+    if hwenc is None:
+        args = ['-c:v', codec_v, '-crf', str(crf), '-preset', preset]
+        if threads and codec_v == 'libx264':
+            args.extend(['-x264-params', f'threads={threads}'])
+        return args
+    if hwenc == 'nvenc':
+        return ['-c:v', HW_ENCODERS[hwenc], '-preset', 'p4', '-cq', str(crf)]
+    if hwenc == 'videotoolbox':
+        return ['-c:v', HW_ENCODERS[hwenc], '-q:v', str(crf_to_q(crf))]
+    if hwenc == 'vaapi':
+        return ['-c:v', HW_ENCODERS[hwenc], '-qp', str(crf)]
+    if hwenc == 'qsv':
+        return ['-c:v', HW_ENCODERS[hwenc], '-global_quality', str(crf), '-preset', preset]
+    raise ValueError(f"Invalid hardware encoder: {hwenc}")
+
+
 def build_ffmpeg_command(input_path: str, output_path: str, filter_complex: str, 
                         has_audio: bool, codec_v: str, crf: int, preset: str,
-                        codec_a: str, audio_bitrate: str) -> List[str]:
-    """Build complete ffmpeg command."""
-    cmd = [
-        'ffmpeg', '-i', input_path,
+                        codec_a: str, audio_bitrate: str,
+                        hwenc: Optional[str] = None, threads: Optional[int] = None) -> List[str]:
+    """
+    Build complete ffmpeg command.
+    
+    When hwenc is set, decoding uses -hwaccel auto and the video is encoded
+    with the matching hardware encoder instead of codec_v. When threads is
+    set, it pins the filter graph and libx264 thread counts.
+    """
+    cmd = ['ffmpeg']
+    video_label = '[outv]'
+    
+    if hwenc:
+        cmd.extend(['-hwaccel', 'auto'])
+        if hwenc == 'vaapi':
+            # Software filter output must be uploaded to the VAAPI device
+            cmd.extend(['-vaapi_device', VAAPI_DEVICE])
+            filter_complex += '; [outv]format=nv12,hwupload[outhw]'
+            video_label = '[outhw]'
+    
+    cmd.extend([
+        '-i', input_path,
         '-filter_complex', filter_complex,
-        '-map', '[outv]'
-    ]
+        '-map', video_label
+    ])
+    
+    if threads:
+        cmd.extend(['-filter_complex_threads', str(threads), '-filter_threads', str(threads)])
     
     if has_audio:
         cmd.extend(['-map', '[outa]'])
     
     # Video encoding options
-    cmd.extend(['-c:v', codec_v, '-crf', str(crf), '-preset', preset])
+    cmd.extend(build_video_encoder_args(codec_v, crf, preset, hwenc, threads))
     
     # Audio encoding options (if audio exists)
     if has_audio:
@@ -339,22 +792,336 @@ def build_ffmpeg_command(input_path: str, output_path: str, filter_complex: str,
     return cmd
 
 
+def build_split_command(input_path: str, ranges: List[Tuple[float, float]],
+                        tmpdir: str) -> Tuple[List[str], List[str]]:
+    """
+    Build a single ffmpeg command that stream-copies every range into its own segment file.
+    
+    Each range is opened as a separately seeked input of the same file, and
+    input N is mapped to segment N, so all segments come out of one process.
+    Only the first video and (if present) audio stream are mapped; data and
+    timecode tracks would make the MP4 muxer fail.
+    
+    Args:
+        input_path: Source video path
+        ranges: List of (start, end) time pairs
+        tmpdir: Directory where segment files are written
+    
+    Returns:
+        Tuple of (ffmpeg command, segment paths in range order)
+    """
+    if not ranges:
+        raise ValueError("No valid ranges to process")
+    
+    cmd = ['ffmpeg']
+    for start, end in ranges:
+        cmd.extend(['-ss', str(start), '-t', str(end - start), '-i', input_path])
+    
+    segment_paths = []
+    for i in range(len(ranges)):
+        segment_path = str(Path(tmpdir) / f"seg{i}.mp4")
+        cmd.extend([
+            '-map', f'{i}:v:0', '-map', f'{i}:a:0?',
+            '-c', 'copy', '-avoid_negative_ts', 'make_zero', segment_path
+        ])
+        segment_paths.append(segment_path)
+    
+    return cmd, segment_paths
+
+
+def build_concat_command(list_path: str, output_path: str) -> List[str]:
+    """Build ffmpeg command that joins segments listed in a concat demuxer file."""
+    cmd = [
+        'ffmpeg', '-f', 'concat', '-safe', '0', '-i', list_path,
+        '-c', 'copy',
+        '-movflags', '+faststart',
+        output_path
+    ]
+    
+    return cmd
+
+
+def write_concat_list(segment_paths: List[str], list_path: str) -> None:
+    """Write a concat demuxer list file referencing the given segments in order."""
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for segment_path in segment_paths:
+            escaped = segment_path.replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+
+def run_stream_copy(input_path: str, ranges: List[Tuple[float, float]], output_path: str,
+                    verbose: bool = False) -> None:
+    """
+    Cut ranges with stream copy and join them with the concat demuxer.
+    
+    All segments are extracted by one ffmpeg process into a temporary
+    directory; no frame is decoded or re-encoded, so each clip starts at the
+    keyframe at or before its range start (see stream_copy_blocker).
+    """
+    with tempfile.TemporaryDirectory(prefix='make_shorts_') as tmpdir:
+        split_cmd, segment_paths = build_split_command(input_path, ranges, tmpdir)
+        run_ffmpeg(split_cmd, verbose)
+        
+        list_path = str(Path(tmpdir) / 'segments.txt')
+        write_concat_list(segment_paths, list_path)
+        run_ffmpeg(build_concat_command(list_path, output_path), verbose)
+
+
+# Number of trailing ffmpeg stderr lines kept for error messages
+STDERR_TAIL_LINES = 200
+
+
 def run_ffmpeg(cmd: List[str], verbose: bool = False) -> None:
-    """Run ffmpeg command and handle output."""
+    """
+    Run ffmpeg command and handle output.
+    
+    In non-verbose mode stdout is discarded and only the last
+    STDERR_TAIL_LINES lines of stderr are kept, for the error message.
+    """
     if verbose:
-        logging.info(f"Running: {' '.join(cmd)}")
-        result = subprocess.run(cmd)
+        log.info("Running: %s", ' '.join(cmd))
+        returncode = subprocess.run(cmd).returncode
+        stderr_tail = None
     else:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # Universal newlines also split ffmpeg's '\r'-separated progress updates
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                   bufsize=65536, text=True, encoding='utf-8', errors='replace')
+        tail = collections.deque(process.stderr, maxlen=STDERR_TAIL_LINES)
+        process.stderr.close()
+        returncode = process.wait()
+        stderr_tail = ''.join(tail)
     
-    if result.returncode != 0:
-        error_msg = f"ffmpeg failed with return code {result.returncode}"
-        if not verbose and result.stderr:
-            error_msg += f"\nStderr: {result.stderr}"
+    if returncode != 0:
+        error_msg = f"ffmpeg failed with return code {returncode}"
+        if stderr_tail:
+            error_msg += f"\nStderr: {stderr_tail}"
         raise RuntimeError(error_msg)
 
 
-def main():
+def resolve_output_path(output: str, only_audio: bool) -> str:
+    """Adjust output file extension for audio-only mode."""
+    if only_audio and not output.lower().endswith('.mp3'):
+        if output == 'shorts.mp4':  # Default output
+            return 'shorts.mp3'
+        # Change extension to .mp3
+        output = str(Path(output).with_suffix('.mp3'))
+        log.info("Changed output extension to .mp3 for audio-only mode: %s", output)
+    return output
+
+
+def make_short(input_path: str, time_tokens: List[str], output: str, args: argparse.Namespace) -> None:
+    """
+    Create one short from input_path using the encoding options in args.
+    
+    Validates the input and time ranges, then builds and runs the ffmpeg
+    command(s); in dry-run mode the commands are only printed.
+    
+    Raises:
+        Exception: on any validation or ffmpeg failure
+    """
+    # Validate input file exists
+    if not Path(input_path).exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    
+    # Check for time tokens before probing
+    if not time_tokens:
+        raise ValueError("No time ranges provided. Specify start/end time pairs.")
+    
+    # Get video information
+    if args.no_probe or args.assume_duration is not None:
+        duration = args.assume_duration if args.assume_duration is not None else float('inf')
+        log.info("Skipping ffprobe; assuming duration %ss and an audio stream", duration)
+        video_info = assumed_video_info(duration)
+    else:
+        log.info("Analyzing input video: %s", input_path)
+        video_info = get_video_info(input_path, use_cache=args.cache_probe)
+    
+    if video_info['duration'] is None:
+        raise RuntimeError("Could not determine video duration")
+    
+    log.info("Video duration: %.2fs", video_info['duration'])
+    log.info("Has audio: %s", video_info['has_audio'])
+    
+    # Check audio availability for audio-only mode
+    if args.only_audio and not video_info['has_audio']:
+        raise ValueError("Cannot extract audio: input video has no audio stream")
+    
+    # Parse, validate/clamp, merge and cap ranges in one pass
+    merge_gap = args.merge_gap if args.merge_adjacent else None
+    validated_ranges = process_ranges(
+        time_tokens, video_info['duration'], args.clamp,
+        args.max_duration, merge_gap
+    )
+    
+    if not validated_ranges:
+        raise ValueError("No valid ranges after validation/clamping")
+    
+    # Check for overlapping ranges
+    check_overlapping_ranges(validated_ranges, merge_gap)
+    
+    # Stream copy mode: skip decoding/encoding entirely when possible
+    if args.stream_copy and not args.only_audio:
+        target_width, target_height = parse_resolution(args.resolution)
+        blocker = stream_copy_blocker(
+            input_path, video_info, validated_ranges, target_width, target_height,
+            args.codec_v, args.max_duration
+        )
+        if blocker is None:
+            if args.dry_run:
+                print("Generated ffmpeg commands:")
+                split_cmd, _ = build_split_command(input_path, validated_ranges, '.')
+                print(' '.join(split_cmd))
+                print(' '.join(build_concat_command('segments.txt', output)))
+                return
+            
+            log.info("Stream copying %d clip(s) to %s", len(validated_ranges), output)
+            run_stream_copy(input_path, validated_ranges, output, args.verbose)
+            
+            log.info("Successfully created: %s", output)
+            return
+        
+        log.warning("Cannot stream copy: %s; falling back to re-encoding", blocker)
+    
+    # Build filter complex and ffmpeg command based on mode
+    if args.only_audio:
+        # Audio-only mode
+        filter_complex = build_audio_filter_complex(validated_ranges)
+        cmd = build_audio_ffmpeg_command(
+            input_path, output, filter_complex,
+            'libmp3lame', args.audio_bitrate  # Force MP3 codec for audio-only
+        )
+    else:
+        # Video mode (original behavior)
+        # Parse resolution
+        target_width, target_height = parse_resolution(args.resolution)
+        
+        # Build filter complex
+        filter_complex = build_filter_complex(
+            validated_ranges, target_width, target_height, 
+            args.scale_mode, video_info['has_audio']
+        )
+        
+        # Resolve hardware encoder
+        hwenc = None
+        if args.hwaccel == 'auto':
+            hwenc = detect_hwenc()
+            if hwenc:
+                log.info("Using hardware encoder: %s", HW_ENCODERS[hwenc])
+            else:
+                log.info("No hardware encoder available, using %s", args.codec_v)
+        elif args.hwaccel != 'none':
+            hwenc = args.hwaccel
+        
+        # Build ffmpeg command
+        cmd = build_ffmpeg_command(
+            input_path, output, filter_complex,
+            video_info['has_audio'], args.codec_v, args.crf, args.preset,
+            args.codec_a, args.audio_bitrate, hwenc, args.threads
+        )
+    
+    if args.dry_run:
+        print("Generated ffmpeg command:")
+        print(' '.join(cmd))
+        return
+    
+    # Run ffmpeg
+    log.info("Processing %d clip(s) to %s", len(validated_ranges), output)
+    run_ffmpeg(cmd, args.verbose)
+    
+    log.info("Successfully created: %s", output)
+
+
+# ffmpeg threads assumed per job when sizing the batch worker pool
+BATCH_THREADS_PER_JOB = 4
+
+
+def load_batch_manifest(manifest_path: str) -> List[Dict[str, Any]]:
+    """
+    Load a batch manifest: a JSON list of {"input", "times", "output"} objects.
+    
+    Returns:
+        List of jobs with times normalized to strings
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        try:
+            manifest = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid batch manifest {manifest_path}: {e}")
+    
+    if not isinstance(manifest, list) or not manifest:
+        raise ValueError(f"Batch manifest {manifest_path} must be a non-empty JSON list of jobs")
+    
+    jobs = []
+    for i, job in enumerate(manifest):
+        if (not isinstance(job, dict)
+                or not isinstance(job.get('input'), str)
+                or not isinstance(job.get('times'), list)
+                or not isinstance(job.get('output'), str)):
+            raise ValueError(f"Batch job {i+1} must have 'input' (string), 'times' (list) and 'output' (string)")
+        jobs.append({
+            'input': job['input'],
+            'times': [str(token) for token in job['times']],
+            'output': job['output']
+        })
+    
+    return jobs
+
+
+def _process_job(job: Dict[str, Any], args: argparse.Namespace) -> str:
+    """Run one batch job in a worker process; returns the output path."""
+    output = resolve_output_path(job['output'], args.only_audio)
+    make_short(job['input'], job['times'], output, args)
+    return output
+
+
+def run_batch(manifest_path: str, args: argparse.Namespace) -> int:
+    """
+    Run every job of a batch manifest, in parallel worker processes.
+    
+    Returns:
+        0 if all jobs succeeded, 1 otherwise
+    """
+    jobs = load_batch_manifest(manifest_path)
+    failures = 0
+    
+    if args.dry_run:
+        # Nothing is encoded, so there is nothing to parallelize
+        for job in jobs:
+            try:
+                _process_job(job, args)
+            except Exception as e:
+                failures += 1
+                log.error("Job %s -> %s failed: %s", job['input'], job['output'], e)
+    else:
+        cpu_count = os.cpu_count() or 1
+        workers = args.jobs or max(1, cpu_count // (args.threads or BATCH_THREADS_PER_JOB))
+        workers = min(len(jobs), workers)
+        log.info("Processing %d job(s) with %d worker(s)", len(jobs), workers)
+        
+        # Split the cores between workers unless threads were given explicitly
+        args = argparse.Namespace(**vars(args))
+        args.threads = args.threads or max(1, cpu_count // workers)
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=setup_logging,
+                                 initargs=(args.verbose,)) as executor:
+            futures = {executor.submit(_process_job, job, args): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failures += 1
+                    log.error("Job %s -> %s failed: %s", job['input'], job['output'], e)
+    
+    if failures:
+        log.error("%d of %d job(s) failed", failures, len(jobs))
+        return 1
+    
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line argument parser."""
     parser = argparse.ArgumentParser(
         description="Extract multiple ranges from a video and concatenate into portrait MP4",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -364,11 +1131,12 @@ Examples:
   python make_shorts.py input.mp4 10 30 --output shorts.mp4 --resolution 1080x1920
   python make_shorts.py input.mp4 10 30 300 320 --scale-mode crop --dry-run
   python make_shorts.py input.mp4 10 30 --only-audio --output audio.mp3
+  python make_shorts.py --batch jobs.json --preset fast
         """
     )
     
     # Positional arguments
-    parser.add_argument('input_path', help='Input video file path')
+    parser.add_argument('input_path', nargs='?', help='Input video file path')
     parser.add_argument('time_tokens', nargs='*', 
                        help='Start and end times (must be even number of tokens)')
     
@@ -388,6 +1156,12 @@ Examples:
     parser.add_argument('--preset', default='medium', help='Encoding preset (default: medium)')
     parser.add_argument('--codec-a', default='aac', help='Audio codec (default: aac)')
     parser.add_argument('--audio-bitrate', default='128k', help='Audio bitrate (default: 128k)')
+    parser.add_argument('--threads', type=int,
+                       help="Threads for the filter graph and libx264 (default: ffmpeg's and "
+                            "x264's own choice)")
+    parser.add_argument('--hwaccel', choices=['none', 'auto'] + list(HW_ENCODERS), default='none',
+                       help='Hardware encoder to use instead of --codec-v; auto picks the first '
+                            'working one (default: none)')
     
     # Behavior options
     parser.add_argument('--dry-run', action='store_true',
@@ -400,119 +1174,71 @@ Examples:
                        help='Clamp start/end to input duration instead of failing')
     parser.add_argument('--only-audio', action='store_true',
                        help='Extract only audio and output as MP3')
+    parser.add_argument('--merge-adjacent', action='store_true',
+                       help='Merge ranges that overlap or touch the previous range, or start '
+                            'within --merge-gap seconds of its end')
+    parser.add_argument('--merge-gap', type=float, default=0.0, metavar='SECS',
+                       help='Largest gap still merged by --merge-adjacent (default: 0)')
+    parser.add_argument('--no-probe', action='store_true',
+                       help='With --dry-run, skip ffprobe and assume an audio stream and unlimited duration')
+    parser.add_argument('--assume-duration', type=float, metavar='SECS',
+                       help='Skip ffprobe and validate ranges against this duration; '
+                            'assumes the input has an audio stream')
+    parser.add_argument('--cache-probe', action=argparse.BooleanOptionalAction, default=True,
+                       help='Reuse ffprobe results cached on disk for unchanged inputs (default: on)')
+    parser.add_argument('--stream-copy', action='store_true',
+                       help='Cut without re-encoding when the input already matches the target '
+                            'resolution and codec and every range starts at a keyframe')
     
-    args = parser.parse_args()
+    # Batch options
+    parser.add_argument('--batch', metavar='MANIFEST',
+                       help='Process many shorts from a JSON list of {"input", "times", "output"} jobs')
+    parser.add_argument('--jobs', type=int,
+                       help='Number of parallel batch workers (default: CPU count / '
+                            f'--threads, or / {BATCH_THREADS_PER_JOB} without --threads)')
+    
+    return parser
+
+
+def main():
+    parser = build_parser()
+    # Intermixed parsing lets options sit between the input and the time tokens
+    args = parser.parse_intermixed_args()
     
     # Setup logging
     setup_logging(args.verbose)
     
+    if args.batch:
+        if args.input_path or args.time_tokens:
+            parser.error("--batch cannot be combined with input_path or time tokens")
+    elif not args.input_path:
+        parser.error("the following arguments are required: input_path")
+    
+    if args.merge_gap < 0:
+        parser.error("--merge-gap must not be negative")
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    
+    if args.no_probe and not args.dry_run:
+        parser.error("--no-probe requires --dry-run")
+    if args.assume_duration is not None and args.assume_duration <= 0:
+        parser.error("--assume-duration must be positive")
+    if args.stream_copy and (args.no_probe or args.assume_duration is not None):
+        parser.error("--stream-copy needs ffprobe to inspect the input; "
+                     "it cannot be combined with --no-probe or --assume-duration")
+    
     # Adjust output file extension for audio-only mode
-    if args.only_audio and not args.output.lower().endswith('.mp3'):
-        if args.output == 'shorts.mp4':  # Default output
-            args.output = 'shorts.mp3'
-        else:
-            # Change extension to .mp3
-            output_path = Path(args.output)
-            args.output = str(output_path.with_suffix('.mp3'))
-            logging.info(f"Changed output extension to .mp3 for audio-only mode: {args.output}")
+    args.output = resolve_output_path(args.output, args.only_audio)
     
     try:
-        # Validate input file exists
-        if not Path(args.input_path).exists():
-            raise FileNotFoundError(f"Input file not found: {args.input_path}")
-        
-        # Parse time tokens
-        if not args.time_tokens:
-            raise ValueError("No time ranges provided. Specify start/end time pairs.")
-        
-        ranges = parse_time_pairs(args.time_tokens)
-        if not ranges:
-            raise ValueError("No valid time ranges after parsing.")
-        
-        # Get video information
-        logging.info(f"Analyzing input video: {args.input_path}")
-        video_info = get_video_info(args.input_path)
-        
-        if video_info['duration'] is None:
-            raise RuntimeError("Could not determine video duration")
-        
-        logging.info(f"Video duration: {video_info['duration']:.2f}s")
-        logging.info(f"Has audio: {video_info['has_audio']}")
-        
-        # Check audio availability for audio-only mode
-        if args.only_audio and not video_info['has_audio']:
-            raise ValueError("Cannot extract audio: input video has no audio stream")
-        
-        # Validate and clamp ranges
-        validated_ranges = validate_and_clamp_ranges(ranges, video_info['duration'], args.clamp)
-        
-        if not validated_ranges:
-            raise ValueError("No valid ranges after validation/clamping")
-        
-        # Check for overlapping ranges
-        check_overlapping_ranges(validated_ranges)
-        
-        # Apply max duration if specified
-        if args.max_duration:
-            total_duration = sum(end - start for start, end in validated_ranges)
-            if total_duration > args.max_duration:
-                logging.warning(f"Total duration ({total_duration:.2f}s) exceeds max duration ({args.max_duration}s)")
-                # Truncate ranges to fit within max duration
-                new_ranges = []
-                current_duration = 0
-                for start, end in validated_ranges:
-                    clip_duration = end - start
-                    if current_duration + clip_duration <= args.max_duration:
-                        new_ranges.append((start, end))
-                        current_duration += clip_duration
-                    else:
-                        # Partial clip to reach max duration
-                        remaining = args.max_duration - current_duration
-                        if remaining > 0:
-                            new_ranges.append((start, start + remaining))
-                        break
-                validated_ranges = new_ranges
-        
-        # Build filter complex and ffmpeg command based on mode
-        if args.only_audio:
-            # Audio-only mode
-            filter_complex = build_audio_filter_complex(validated_ranges)
-            cmd = build_audio_ffmpeg_command(
-                args.input_path, args.output, filter_complex,
-                'libmp3lame', args.audio_bitrate  # Force MP3 codec for audio-only
-            )
-        else:
-            # Video mode (original behavior)
-            # Parse resolution
-            target_width, target_height = parse_resolution(args.resolution)
-            
-            # Build filter complex
-            filter_complex = build_filter_complex(
-                validated_ranges, target_width, target_height, 
-                args.scale_mode, video_info['has_audio']
-            )
-            
-            # Build ffmpeg command
-            cmd = build_ffmpeg_command(
-                args.input_path, args.output, filter_complex,
-                video_info['has_audio'], args.codec_v, args.crf, args.preset,
-                args.codec_a, args.audio_bitrate
-            )
-        
-        if args.dry_run:
-            print("Generated ffmpeg command:")
-            print(' '.join(cmd))
-            return 0
-        
-        # Run ffmpeg
-        logging.info(f"Processing {len(validated_ranges)} clip(s) to {args.output}")
-        run_ffmpeg(cmd, args.verbose)
+        if args.batch:
+            return run_batch(args.batch, args)
         
-        logging.info(f"Successfully created: {args.output}")
+        make_short(args.input_path, args.time_tokens, args.output, args)
         return 0
         
     except Exception as e:
-        logging.error(str(e))
+        log.error("%s", e)
         return 1
 
 